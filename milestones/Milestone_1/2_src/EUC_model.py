@@ -2,7 +2,8 @@ import pyomo.environ as pyo
 from pyomo.opt import SolverFactory
 from pyomo.core import Var, value
 import numpy as np
-import pandas as pd
+import concurrent.futures
+import os
 
 ###############################################################################
 ### Model Options
@@ -15,8 +16,12 @@ sensitivity_analysis = True
 # enables detailed output, recommended only without sensitivity analysis
 detailed_output = False
 
-# enables the output of csv files, saved into '2_results'
-csv_output = True
+# enables solving the lambdas in parallel
+parallel = True
+
+# enables the additional output of csv files for every lambda, saved into
+# '3_results', the plotting only needs the sweep results
+csv_output = False
 
 ###############################################################################
 ### Parameters
@@ -48,19 +53,12 @@ pmax = np.array([20,40])
 ### Model
 ###############################################################################
 
-# create empty lists
-objective_values = []
-net_costs = []
-# fuel costs is a dictionary of lists with key equal to generator index
-fuel_costs = {
-    0: [],
-    1: []
-}
-
-# loop through lambdas
-for lamda in lmbdas:
-
-    # create concrete pyomo model
+def create_model(lamda:float) -> pyo.ConcreteModel:
+    """
+    This function creates the unit commitment model for the initial
+    electricity price lamda. The model is built only once, afterwards only the
+    mutable parameter 'lam' has to be updated before the next solve.
+    """
     model = pyo.ConcreteModel()
 
     #---------------------------------------------------------------------------
@@ -74,6 +72,13 @@ for lamda in lmbdas:
     # generator set for the two generators
     model.G = pyo.RangeSet(0,1)
 
+    #---------------------------------------------------------------------------
+    # Parameters
+    #---------------------------------------------------------------------------
+
+    # retail electricity price, mutable to update it for every lambda
+    model.lam = pyo.Param(initialize=lamda, mutable=True, within=pyo.Reals)
+
     #---------------------------------------------------------------------------
     # Variables
     #---------------------------------------------------------------------------
@@ -96,10 +101,13 @@ for lamda in lmbdas:
 
     # first part is net power cost with distribution company,
     # second part is fuel costs
+    # the fuel costs (c2*pg**2 + c1*pg + c)*u are linear in y, pg and u because
+    # the maximum generation constraint forces pg (and thus y) to zero for an
+    # unused generator, so the bilinear products with u are not needed
     model.OBJ = pyo.Objective(
-        expr=sum(lamda*model.pn[h] for h in model.H)
+        expr=sum(model.lam*model.pn[h] for h in model.H)
             + sum(
-                (c2[g]*model.y[h,g] + c1[g]*model.pg[h,g] + c[g])*model.u[h,g]
+                c2[g]*model.y[h,g] + c1[g]*model.pg[h,g] + c[g]*model.u[h,g]
                 for h in model.H for g in model.G
             )
     )
@@ -108,38 +116,90 @@ for lamda in lmbdas:
     # Constraints
     #---------------------------------------------------------------------------
 
+    # the constraints are added as algebraic expressions to constraint lists
+    # instead of evaluating a rule function for every index
+
     # load for each hour
-    def loadc(model, H):
-        return sum(model.pg[H,g] for g in model.G) + model.pn[H] == pl[H]
-    model.loadc = pyo.Constraint(model.H, rule=loadc)
+    model.loadc = pyo.ConstraintList()
+    for h in model.H:
+        model.loadc.add(
+            sum(model.pg[h,g] for g in model.G) + model.pn[h] == pl[h]
+        )
 
     # minimum generation for each used generator and hour
-    def minc(model, H, G):
-        return model.u[H,G]*pmin[G] <= model.pg[H,G]
-    model.minc = pyo.Constraint(model.H, model.G, rule=minc)
-
+    model.minc = pyo.ConstraintList()
     # maximum generation for each used generator and hour
-    def maxc(model, H, G):
-        return model.u[H,G]*pmax[G] >= model.pg[H,G]
-    model.maxc = pyo.Constraint(model.H,model.G, rule=maxc)
-
-    # constraint for helper variable
-    def hvc(model, H, G):
-        return model.y[H,G] == model.pg[H,G]**2
-    model.hvc = pyo.Constraint(model.H, model.G, rule=hvc)
-
-    #---------------------------------------------------------------------------
-    # Results
-    #---------------------------------------------------------------------------
-
-    opt = pyo.SolverFactory('gurobi')
-    opt.options['NonConvex'] = 2
-
-    results = opt.solve(model)
-
-    model.solutions.load_from(results)
+    model.maxc = pyo.ConstraintList()
+    # convex constraint for helper variable, y is equal to pg**2 in the
+    # optimum because c2 is positive and y is minimized
+    model.hvc = pyo.ConstraintList()
+    for h in model.H:
+        for g in model.G:
+            model.minc.add(model.u[h,g]*pmin[g] <= model.pg[h,g])
+            model.maxc.add(model.u[h,g]*pmax[g] >= model.pg[h,g])
+            model.hvc.add(model.y[h,g] >= model.pg[h,g]**2)
+
+    return model
+
+#-------------------------------------------------------------------------------
+# Solver
+#-------------------------------------------------------------------------------
+
+# model and solver of the current process, every worker process builds its
+# own instances because the persistent solver can not be shared
+model = None
+opt = None
+
+# gurobi variables of pn, pg and u to read the solution values in one call
+solver_vars = {}
+
+def init_worker():
+    """
+    This function creates the model and the persistent solver of the current
+    process. The persistent solver keeps the gurobi model between the solves,
+    therefore the previous solution can be used as a start for the next lambda.
+    """
+    global model, opt
+    model = create_model(lmbdas[0])
+    # the model is passed to gurobi via its python interface instead of writing
+    # a LP file, hence parameters are set directly on the gurobi model once
+    opt = pyo.SolverFactory('gurobi_persistent')
+    opt.set_instance(model)
+    if parallel:
+        # one thread per worker to not oversubscribe the cores
+        opt.set_gurobi_param('Threads', 1)
+
+    var_map = opt._pyomo_var_to_solver_var_map
+    solver_vars['pn'] = [var_map[model.pn[h]] for h in model.H]
+    solver_vars['pg'] = [
+        var_map[model.pg[h,g]] for h in model.H for g in model.G
+    ]
+    solver_vars['u'] = [
+        var_map[model.u[h,g]] for h in model.H for g in model.G
+    ]
+
+def solve_lambda(lamda:float) -> dict:
+    """
+    This function solves the model for the electricity price lamda and returns
+    the objective value and the solution values of pn, pg and u. Hereby, pg and
+    u are of shape (hours, generators).
+    """
+    # update electricity price and pass the new objective to the solver
+    model.lam.set_value(lamda)
+    opt.set_objective(model.OBJ)
+
+    # the solution is read from gurobi directly instead of loading it into
+    # the pyomo variables
+    results = opt.solve(save_results=False, load_solutions=False)
+
+    solver_model = opt._solver_model
+
+    # pass the solution as a MIP start for the next lambda
+    all_vars = solver_model.getVars()
+    solver_model.setAttr('Start', all_vars, solver_model.getAttr('X', all_vars))
 
     if detailed_output:
+        opt.load_vars()
         results.write()
         for v in model.component_objects(Var, active=True):
             print ("Variable", v)
@@ -147,91 +207,121 @@ for lamda in lmbdas:
             for index in varobject:
                 print ("\t",index, varobject[index].value)
 
-    if csv_output:
-        data_dic_generator = {
-            "Hour": [],
-            "Generator": [],
-            "Unit commitment": [],
-            "Generation": []
-        }
-        data_dic_retailer = {
-            "Hour": [],
-            "Import/Export": []
-        }
-        for v in model.component_objects(Var, active=True):
-            varobject = getattr(model, str(v))
-            for index in varobject:
-                if str(v) == "pn":
-                    # fill dictionary for retailer
-                    data_dic_retailer["Hour"].append(index)
-                    data_dic_retailer["Import/Export"].append(
-                        varobject[index].value
-                    )
-                elif str(v) == "pg":
-                    # fill dictionary for generator
-                    data_dic_generator["Hour"].append(index[0])
-                    data_dic_generator["Generator"].append(index[1])
-                    data_dic_generator["Generation"].append(
-                        varobject[index].value
-                    )
-                elif str(v) == "u":
-                    # fill generator dictionary with unit commitment value
-                    data_dic_generator["Unit commitment"].append(
-                        varobject[index].value
-                    )
-
-    # create dataframes
-    df_retailer = pd.DataFrame(data_dic_retailer)
-    df_generator = pd.DataFrame(data_dic_generator)
-
-    # export dataframes into '3_results' as CSV
-    df_retailer.to_csv(
-        '../3_results/retailer_lambda_'
-        + str(round(lamda, 4)) + '.csv',
-        index=False
-    )
-    df_generator.to_csv(
-        '../3_results/generator_lambda_'
-        + str(round(lamda, 4)) + '.csv',
-        index=False
-    )
+    shape = (len(model.H), len(model.G))
+    return {
+        'lamda': lamda,
+        'pn': np.array(solver_model.getAttr('X', solver_vars['pn'])),
+        'pg': np.array(
+            solver_model.getAttr('X', solver_vars['pg'])
+        ).reshape(shape),
+        'u': np.array(
+            solver_model.getAttr('X', solver_vars['u'])
+        ).reshape(shape),
+        'obj': opt.get_model_attr('ObjVal')
+    }
+
+if __name__ == '__main__':
+
+    if parallel:
+        # solve the lambdas in parallel, the number of workers is set
+        # automatically. every worker solves a contiguous run of lambdas, so
+        # the solution of the previous lambda is the MIP start of the next
+        # one. with more workers than lambdas, every worker solves a single
+        # lambda without MIP start but all cores are used
+        chunksize = -(-len(lmbdas) // os.cpu_count())
+        with concurrent.futures.ProcessPoolExecutor(
+            initializer=init_worker
+        ) as executor:
+            results = list(
+                executor.map(solve_lambda, lmbdas, chunksize=chunksize)
+            )
+    else:
+        # solve the lambdas one after another with the same model
+        init_worker()
+        results = list(map(solve_lambda, lmbdas))
+
+    # create result arrays for all lambdas
+    n = len(lmbdas)
+    # solution values with first index equal to lambda index
+    pn_values = np.empty((n, len(pl)))
+    pg_values = np.empty((n, len(pl), len(pmax)))
+    u_values = np.empty((n, len(pl), len(pmax)))
+    objective_values = np.empty(n)
+    net_costs = np.empty(n)
+    # fuel costs with row index equal to generator index
+    fuel_costs = np.empty((2, n))
+
+    # index columns of the csv files, identical for every lambda
+    hours = np.arange(len(pl))
+    generators = np.arange(len(pmax))
+    hour_column = np.repeat(hours, len(generators))
+    generator_column = np.tile(generators, len(hours))
 
-    # save objective value
-    objective_values.append(pyo.value(model.OBJ))
-
-    # calculate and save fuel costs and net costs
-    net_costs.append(df_retailer['Import/Export'].sum()*lamda)
-    for g in range(0,2):
-        df_generator['Costs'] = df_generator.apply(
-            lambda x:
-                (
-                    c2[g]*x.Generation**2 + c1[g]*x.Generation + c[g]
-                )*x['Unit commitment'],
-            axis=1
-        )
-        fuel_costs[g].append(
-            df_generator[df_generator.Generator == g].Costs.sum()
-        )
+    #---------------------------------------------------------------------------
+    # Results
+    #---------------------------------------------------------------------------
 
-if sensitivity_analysis:
-    prefix = '_sensitivity.csv'
-else:
-    prefix = '_no_sensitivity.csv'
-
-# export objective values, fuel costs and net costs into '3_results' as CSV
-np.array(objective_values).tofile(
-    '../3_results/objective_values' + prefix,
-    sep = ','
-)
-np.array(fuel_costs[0]).tofile(
-    '../3_results/fuel_costs_generator1' + prefix,
-    sep = ','
-)
-np.array(fuel_costs[1]).tofile(
-    '../3_results/fuel_costs_generator2' + prefix,
-    sep = ','
-)
-np.array(net_costs).tofile(
-    '../3_results/net_costs' + prefix,
-    sep = ','
-)
\ No newline at end of file
+    for i, result in enumerate(results):
+        lamda = result['lamda']
+        pn = result['pn']
+        pg = result['pg']
+        u = result['u']
+
+        pn_values[i] = pn
+        pg_values[i] = pg
+        u_values[i] = u
+
+        if csv_output:
+            # export results into '3_results' as CSV, all columns are
+            # numeric so the arrays are written without creating dataframes
+            lamda_key = round(lamda, 4)
+            np.savetxt(
+                f'../3_results/retailer_lambda_{lamda_key}.csv',
+                np.column_stack((hours, pn)),
+                fmt=('%d', '%.15g'),
+                delimiter=',',
+                header='Hour,Import/Export',
+                comments=''
+            )
+            np.savetxt(
+                f'../3_results/generator_lambda_{lamda_key}.csv',
+                np.column_stack((
+                    hour_column,
+                    generator_column,
+                    u.ravel(),
+                    pg.ravel()
+                )),
+                fmt=('%d', '%d', '%.15g', '%.15g'),
+                delimiter=',',
+                header='Hour,Generator,Unit commitment,Generation',
+                comments=''
+            )
+
+        # save objective value
+        objective_values[i] = result['obj']
+
+        # calculate and save fuel costs and net costs
+        net_costs[i] = pn.sum()*lamda
+        for g in range(0,2):
+            fuel_costs[g, i] = (
+                (c2[g]*pg[:,g]**2 + c1[g]*pg[:,g] + c[g])*u[:,g]
+            ).sum()
+
+    if sensitivity_analysis:
+        prefix = '_sensitivity'
+    else:
+        prefix = '_no_sensitivity'
+
+    # export solution values, objective values, fuel costs and net costs of
+    # all lambdas into '3_results' as one NPZ file
+    np.savez_compressed(
+        '../3_results/sweep' + prefix + '.npz',
+        lambdas=np.array(lmbdas),
+        pn=pn_values,
+        pg=pg_values,
+        u=u_values,
+        objective_values=objective_values,
+        fuel_costs_generator1=fuel_costs[0],
+        fuel_costs_generator2=fuel_costs[1],
+        net_costs=net_costs
+    )
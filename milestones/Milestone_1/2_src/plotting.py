@@ -1,3 +1,6 @@
+from functools import lru_cache
+import os
+
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -7,8 +10,11 @@ from matplotlib.lines import Line2D
 ### Matplotlib Settings
 ###############################################################################
 
+# matplotlib's built-in mathtext renders the lambda labels, an external LaTeX
+# run for every text element is not needed
 settings = {
-    'text.usetex': True,
+    'text.usetex': False,
+    'mathtext.fontset': 'cm',
     'font.weight' : 'normal',
     'font.size'   : 14
 }
@@ -17,32 +23,106 @@ plt.rcParams.update(**settings)
 # resolution for plots
 dpi = 300
 
-# path to csv files
+# path to result files
 path = '../3_results/'
 
 # saving path
 saving_path = '../4_plots/'
 
 ###############################################################################
-### Helper
+### Constants
 ###############################################################################
 
-def create_generator_df(lamda:int = 0.2197, unit:int = 0) -> pd.DataFrame:
-    df = pd.read_csv(
-        path + 'generator_lambda_' + str(lamda) + '.csv'
-    )
-    df = df[df.Generator == unit]
-    return df
+# load values for 24 hours
+DEMAND = np.array(
+    [8,8,10,10,10,16,22,24,26,32,30,28,22,18,16,16,20,24,28,34,38,30,22,12],
+    dtype=np.float64
+)
+DEMAND.flags.writeable = False
 
-def create_retailer_df(lamda:int = 0.2197) -> pd.DataFrame:
-    return pd.read_csv(
-        path + 'retailer_lambda_' + str(lamda) + '.csv'
-    )
+# demand is plotted as consumption
+NEG_DEMAND = -DEMAND
+NEG_DEMAND.flags.writeable = False
 
-def get_demand() -> np.array:
-    return np.array(
-        [8,8,10,10,10,16,22,24,26,32,30,28,22,18,16,16,20,24,28,34,38,30,22,12]
-    )
+# lambdas of the sensitivity analysis and their rounded values
+LAMDAS = np.arange(5,80,10)*0.01
+LAMDA_KEYS = [round(lamda, 4) for lamda in LAMDAS]
+
+###############################################################################
+### Helper
+###############################################################################
+
+@lru_cache(maxsize=None)
+def load_sweep(sensitivity:bool = False) -> dict:
+    """
+    This function loads the solution values and costs of all lambdas from the
+    npz file of the corresponding run only once. Without the npz file, the
+    arrays are built from the csv files of former runs. Every further call
+    returns the cached arrays, hence they must not be modified.
+    """
+    if sensitivity:
+        prefix = '_sensitivity'
+        lambdas = LAMDAS
+    else:
+        prefix = '_no_sensitivity'
+        lambdas = np.array([0.2197])
+    if os.path.exists(path + 'sweep' + prefix + '.npz'):
+        with np.load(path + 'sweep' + prefix + '.npz') as data:
+            return {key: data[key] for key in data.files}
+
+    # former runs saved the solution values with one csv file per lambda
+    pn, pg, u = [], [], []
+    for lamda in lambdas:
+        lamda_key = round(lamda, 4)
+        df_retailer = pd.read_csv(f'{path}retailer_lambda_{lamda_key}.csv')
+        pn.append(df_retailer['Import/Export'].to_numpy())
+        df_generator = pd.read_csv(
+            f'{path}generator_lambda_{lamda_key}.csv'
+        ).sort_values(['Hour', 'Generator'])
+        shape = (-1, df_generator['Generator'].nunique())
+        pg.append(df_generator['Generation'].to_numpy().reshape(shape))
+        u.append(df_generator['Unit commitment'].to_numpy().reshape(shape))
+    sweep = {
+        'lambdas': lambdas,
+        'pn': np.array(pn),
+        'pg': np.array(pg),
+        'u': np.array(u)
+    }
+    # and the objective values and costs of all lambdas with one csv file each
+    for key in ('objective_values', 'fuel_costs_generator1',
+                'fuel_costs_generator2', 'net_costs'):
+        sweep[key] = np.loadtxt(
+            path + key + prefix + '.csv',
+            delimiter=',',
+            ndmin=1
+        )
+    return sweep
+
+def get_lambda_index(sweep:dict, lamda:float) -> int:
+    return int(np.flatnonzero(np.isclose(sweep['lambdas'], lamda))[0])
+
+def create_generator_df(lamda:int = 0.2197, unit:int = 0,
+                        sensitivity:bool = False) -> pd.DataFrame:
+    sweep = load_sweep(sensitivity)
+    i = get_lambda_index(sweep, lamda)
+    return pd.DataFrame({
+        'Hour': np.arange(sweep['pg'].shape[1]),
+        'Generator': unit,
+        'Unit commitment': sweep['u'][i, :, unit],
+        'Generation': sweep['pg'][i, :, unit]
+    })
+
+def create_retailer_df(lamda:int = 0.2197,
+                       sensitivity:bool = False) -> pd.DataFrame:
+    sweep = load_sweep(sensitivity)
+    i = get_lambda_index(sweep, lamda)
+    return pd.DataFrame({
+        'Hour': np.arange(sweep['pn'].shape[1]),
+        'Import/Export': sweep['pn'][i]
+    })
+
+def get_generation(df:pd.DataFrame) -> np.ndarray:
+    return df['Generation'].to_numpy()
 
 ###############################################################################
 ### Solution for lambda 21.97 ct/kWh
@@ -60,44 +140,24 @@ df_retailer = create_retailer_df(lamda=lamda)
 # hourly time steps
 t = np.array(df_generator_1.Hour.values) + 1
 
-# demand
-demand = get_demand()
-
-# import
-df_retailer['Imports'] = df_retailer.apply(
-    lambda x: x['Import/Export'] if x['Import/Export'] > 0 else 0,
-    axis=1
-)
-import_values = df_retailer['Imports'].values
+# import and export
+import_export = df_retailer['Import/Export'].to_numpy()
+import_values = np.maximum(import_export, 0.0)
+export_values = np.minimum(import_export, 0.0)
 
-# export
-df_retailer['Exports'] = df_retailer.apply(
-    lambda x: x['Import/Export'] if x['Import/Export'] < 0 else 0,
-    axis=1
-)
-export_values = df_retailer['Exports'].values
+# generation
+generation_1 = get_generation(df_generator_1)
+generation_2 = get_generation(df_generator_2)
 
 # production
-production_stacked = np.vstack(
-    [
-        list(df_generator_1.Generation),
-        list(df_generator_2.Generation),
-        import_values
-    ]
-)
+production_stacked = np.vstack((generation_1, generation_2, import_values))
 
-# consumption
-consumption_stacked = np.vstack(
-    [
-        (
-            np.array(list(df_generator_1.Generation))
-            + np.array(list(df_generator_2.Generation))
-            + np.array(export_values)
-            + np.array(import_values)
-        )*(-1),
-        export_values
-    ]
-)
+# consumption, summed and negated in place to avoid temporary arrays
+consumption = np.add(generation_1, generation_2)
+consumption += export_values
+consumption += import_values
+np.negative(consumption, out=consumption)
+consumption_stacked = np.vstack((consumption, export_values))
 
 # plot
 fig, ax = plt.subplots(figsize=(6,4))
@@ -116,7 +176,7 @@ ax.stackplot(
     labels=['', 'Export']
 )
 # demnad
-ax.plot(t, demand*(-1), linestyle='--', color='red', label='Demand')
+ax.plot(t, NEG_DEMAND, linestyle='--', color='red', label='Demand')
 plt.hlines(0, xmin=1, xmax=len(t),linestyles='-', linewidth=2.0)
 ax.set_xlabel('Hourly timesteps')
 ax.set_ylabel('kW')
@@ -124,102 +184,83 @@ ax.set_ylabel('kW')
 ax.grid()
 
 plt.legend(bbox_to_anchor=(1,1), loc="upper left")
-plt.savefig(
-    saving_path + f'balance_plot_lambda_{str(lamda)}.png',
-    dpi=dpi,
-    bbox_inches='tight'
-)
+
+# for better layout, computed once instead of an extra render for a tight
+# bounding box while saving
+fig.tight_layout()
+
+fig.savefig(f'{saving_path}balance_plot_lambda_{lamda}.png', dpi=dpi)
 
 ###############################################################################
 ### Sensitivity analysis - Energy balance
 ###############################################################################
 
-lamdas = np.arange(5,80,10)*0.01
-
 fig, ax = plt.subplots(4,2,figsize=(13,8))
 
-row = 0
-col = 0
-
-for lamda in lamdas:
-
-    # get generator specific dataframes
-    df_generator_1 = create_generator_df(lamda=round(lamda, 4), unit=0)
-    df_generator_2 = create_generator_df(lamda=round(lamda, 4), unit=1)
-
-    # retailer
-    df_retailer = create_retailer_df(lamda=round(lamda, 4))
+# get the solution values of all lambdas, the sweep archive is ordered like
+# LAMDAS so the panels are indexed by position instead of a file per lambda
+sweep = load_sweep(sensitivity=True)
+generation_1 = sweep['pg'][:, :, 0]
+generation_2 = sweep['pg'][:, :, 1]
 
-    # hourly time steps
-    t = np.array(df_generator_1.Hour.values) + 1
+# hourly time steps
+t = np.arange(generation_1.shape[1]) + 1
+
+# import and export
+import_export = sweep['pn']
+import_values = np.maximum(import_export, 0.0)
+export_values = np.minimum(import_export, 0.0)
+
+# cumulative production for all lambdas, computed once instead of letting
+# stackplot compute it for every panel
+production_1 = generation_1
+production_2 = production_1 + generation_2
+production_3 = production_2 + import_values
+
+# cumulative consumption for all lambdas, summed and negated in place to avoid
+# temporary arrays
+consumption_1 = np.add(generation_1, generation_2)
+consumption_1 += export_values
+consumption_1 += import_values
+np.negative(consumption_1, out=consumption_1)
+consumption_2 = consumption_1 + export_values
 
-    # demand
-    demand = get_demand()
+row = 0
+col = 0
 
-    # import
-    df_retailer['Imports'] = df_retailer.apply(
-        lambda x: x['Import/Export'] if x['Import/Export'] > 0 else 0,
-        axis=1
-    )
-    import_values = df_retailer['Imports'].values
+for i, lamda_key in enumerate(LAMDA_KEYS):
 
-    # export
-    df_retailer['Exports'] = df_retailer.apply(
-        lambda x: x['Import/Export'] if x['Import/Export'] < 0 else 0,
-        axis=1
-    )
-    export_values = df_retailer['Exports'].values
+    # plots
 
     # production
-    production_stacked = np.vstack(
-        [
-            list(df_generator_1.Generation),
-            list(df_generator_2.Generation),
-            import_values
-        ]
+    ax[row][col].fill_between(
+        t, 0, production_1[i], color='mediumblue', label='Generator 1'
     )
-
-    # consumption
-    consumption_stacked = np.vstack(
-        [
-            (
-                np.array(list(df_generator_1.Generation))
-                + np.array(list(df_generator_2.Generation))
-                + np.array(export_values)
-                + np.array(import_values)
-            )*(-1),
-            export_values
-        ]
+    ax[row][col].fill_between(
+        t, production_1[i], production_2[i], color='forestgreen',
+        label='Generator 2'
     )
-
-    # plots
-
-    # production
-    ax[row][col].stackplot(
-        t,
-        production_stacked,
-        labels=['Generator 1', 'Generator 2', 'Import'],
-        colors=['mediumblue', 'forestgreen', 'darkorange']
+    ax[row][col].fill_between(
+        t, production_2[i], production_3[i], color='darkorange',
+        label='Import'
     )
     # consumption
-    ax[row][col].stackplot(
-        t,
-        consumption_stacked,
-        colors=['grey', 'lightseagreen'],
-        labels=['', 'Export']
+    ax[row][col].fill_between(
+        t, 0, consumption_1[i], color='grey', label=''
+    )
+    ax[row][col].fill_between(
+        t, consumption_1[i], consumption_2[i], color='lightseagreen',
+        label='Export'
     )
     # demnad
     ax[row][col].plot(
         t,
-        demand*(-1),
+        NEG_DEMAND,
         linestyle='--',
         color='red',
         label='Demand'
     )
-    ax[row][col].set_title(
-        r'$\lambda$ = '
-        + str(round(lamda, 4))
-    )
+    ax[row][col].set_title(rf'$\lambda$ = {lamda_key}')
     ax[row][col].grid()
 
     col += 1
@@ -244,31 +285,20 @@ ax[0][1].legend(
 # for better layout
 fig.tight_layout()
 
-plt.savefig(
-    saving_path + 'balance_plot_sensitivity.png',
-    dpi=dpi,
-    bbox_inches='tight'
-)
+fig.savefig(saving_path + 'balance_plot_sensitivity.png', dpi=dpi)
 
 ###############################################################################
 ### Sensitivity analysis - Objective value
 ###############################################################################
 
-objective_values = np.loadtxt(
-     fname=path + 'objective_values_sensitivity.csv',
-     delimiter=','
-)
-fuel_costs_generator1 = np.loadtxt(
-     fname=path + 'fuel_costs_generator1_sensitivity.csv',
-     delimiter=','
-)
-fuel_costs_generator2 = np.loadtxt(
-     fname=path + 'fuel_costs_generator2_sensitivity.csv',
-     delimiter=','
-)
-net_costs = np.loadtxt(
-     fname=path + 'net_costs_sensitivity.csv',
-     delimiter=','
+# the sweep archive is already loaded for the energy balance
+objective_values, fuel_costs_generator1, fuel_costs_generator2, net_costs = (
+    sweep[key] for key in (
+        'objective_values',
+        'fuel_costs_generator1',
+        'fuel_costs_generator2',
+        'net_costs'
+    )
 )
 
 fig, ax = plt.subplots(2,figsize=(13,8))
@@ -277,7 +307,7 @@ fig, ax = plt.subplots(2,figsize=(13,8))
 width = 0.04
 
 # set x values for first 5 values
-x = np.array([round(lamda,2) for lamda in lamdas[:5]])
+x = np.array([round(lamda,2) for lamda in LAMDAS[:5]])
 
 ax[0].bar(
     x - width/2,
@@ -318,7 +348,7 @@ ax[0].legend(
 )
 
 # set x values for last 4 values
-x = np.array([round(lamda,2) for lamda in lamdas[5:]])
+x = np.array([round(lamda,2) for lamda in LAMDAS[5:]])
 
 ax[1].bar(
     x - width/2,
@@ -358,8 +388,4 @@ ax[1].grid()
 # for better layout
 fig.tight_layout()
 
-plt.savefig(
-    saving_path + 'costs_sensitivity.png',
-    dpi=dpi,
-    bbox_inches='tight'
-)
\ No newline at end of file
+fig.savefig(saving_path + 'costs_sensitivity.png', dpi=dpi)
\ No newline at end of file
@@ -250,7 +250,7 @@ for l2 in l2s:
         objective,
         master_prob,
         results_master,
-        results_sub,
+        helper.stack_results(results_sub),
         samples=[0],
         epsilon=epsilon
     )
@@ -299,7 +299,7 @@ for l2 in l2s:
             objective,
             master_prob,
             results_master,
-            results_sub,
+            helper.stack_results(results_sub),
             samples=[0],
             epsilon=epsilon
         )
@@ -1,6 +1,10 @@
 import pyomo.environ as pyo
 from pyomo.opt import SolverFactory
+import gurobipy as gp
+from gurobipy import GRB
+import concurrent.futures
 import time as tm
+import os
 import numpy as np
 import json
 import pandas as pd
@@ -20,9 +24,25 @@ sensitivity_analysis = False
 # enables the output of csv files, saved into '3_results'
 csv_output = False
 
+# enables the parallel solving of the sub problem for all samples
+parallel = True
+
+# enables the solving of the sub problem for all samples at once with numpy
+# instead of gurobi, the sub problem is solved exactly because it decomposes
+# into one small LP per hour
+batch_solve = False
+
 # sample size for monte carlo simulation
 sample_size = 10000
 
+# enables the clustering of the samples, the L-shape method is solved for the
+# representative samples weighted by the share of samples in their cluster
+# first and afterwards continued with all samples until the bounds converge
+clustering = True
+
+# number of clusters
+clusters = 200
+
 # set seed for randomness
 seed = 12
 
@@ -59,7 +79,7 @@ LOADS = helper.get_loads()
 SAMPLES = helper.get_monte_carlo_samples(LOADS, samples=sample_size, seed=seed)
 
 # hours
-HOURS = list(range(0, len(LOADS)))
+HOURS = np.arange(len(LOADS))
 
 # arbitrary value for convergence check
 epsilon = 0.0001
@@ -68,8 +88,11 @@ epsilon = 0.0001
 ### L-shape method
 ###############################################################################
 
-# solver for MIP
-opt = pyo.SolverFactory('gurobi')
+# persistent solver for MIP, the optimality cuts are added with a callback
+opt = pyo.SolverFactory('gurobi_persistent')
+
+# number of processes for solving the sub problem in parallel
+n_workers = os.cpu_count()
 
 #------------------------------------------------------------------------------
 # Helper functions
@@ -90,327 +113,488 @@ def master_prob(u, p1, alpha):
     """
     return sum(c1*u[h] + l1*p1[h] + alpha[h] for h in HOURS)
 
-# dataframe for computation times
-times_dic = {'l2': [], 'time': []}
-
-# loop over all real time prices and solve the L-shape method
-for l2 in l2s:
-
-    helper.print_sens_step(f'Solve L-Shape method for {l2} $/kWh')
-
-    #---------------------------------------------------------------------------
-    # Helper variables
-    #---------------------------------------------------------------------------
-
-    # list for the differences of the bounds
-    bounds_difference = []
-
-    # list for the objective values
-    objective_values = []
-
-    # list for lower bound values
-    lower_bounds = []
-
-    #---------------------------------------------------------------------------
-    #---------------------------------------------------------------------------
-    # Master problem
-    #---------------------------------------------------------------------------
-    #---------------------------------------------------------------------------
+#------------------------------------------------------------------------------
+# Sub problem
+#------------------------------------------------------------------------------
 
-    master = pyo.ConcreteModel()
+# sub problem of the current process with its gurobi variables and constraints
+sub = None
+sub_vars = {}
+sub_cons = {}
 
-    # **************************************************************************
-    # Sets
-    # **************************************************************************
+def create_sub_problem(l2:float):
+    """
+    This function creates the sub problem for the real time price l2 directly
+    with the matrix interface of gurobi. The right hand sides of the
+    constraints are set for every sample and solution of the master problem.
+    It returns the model with its variables and constraints.
+    """
+    sub = gp.Model('sub')
+    sub.Params.OutputFlag = 0
 
-    # hour set
-    master.H = pyo.RangeSet(0, 23)
+    hours = len(HOURS)
 
     # **************************************************************************
     # Variables
     # **************************************************************************
 
-    # unit commitment for generator
-    master.u = pyo.Var(master.H, within=pyo.Binary)
-
-    # electricity purchased with the forward contract
-    master.p1 = pyo.Var(master.H, within=pyo.NonNegativeReals)
+    # electricity produced by generator
+    pg = sub.addMVar(hours, lb=0, name='pg')
 
-    # value function for second stage problem
-    master.alpha = pyo.Var(master.H)
+    # electrictiy bought from retailer
+    p2 = sub.addMVar(hours, lb=0, name='p2')
 
     # **************************************************************************
     # Objective function
     # **************************************************************************
 
-    def master_obj(master):
-        return sum(
-            c1*master.u[h] + l1*master.p1[h] + master.alpha[h] for h in master.H
-        )
-    master.OBJ = pyo.Objective(rule=master_obj)
+    sub.setObjective(c2*pg.sum() + l2*p2.sum(), GRB.MINIMIZE)
 
     # **************************************************************************
     # Constraints
     # **************************************************************************
 
-    # alpha down (-500) is an arbitrary selected bound
-    def alphacon1(master, H):
-        return master.alpha[H] >= -500
-    master.alphacon1 = pyo.Constraint(master.H, rule=alphacon1)
+    # load must be covered by production or purchasing electrictiy, the right
+    # hand side is the load of the sample minus the electricity of the forward
+    # contract
+    con_load = sub.addConstr(pg + p2 >= np.zeros(hours), name='con_load')
 
-    #---------------------------------------------------------------------------
-    # Initialization of master problem
-    #---------------------------------------------------------------------------
+    # maximum capacity of generator, the right hand side is the capacity with
+    # the unit commitment of the master problem
+    con_max = sub.addConstr(pg <= np.zeros(hours), name='con_max')
 
-    # save current time to get the time of calculating
-    time_start = tm.time()
+    return sub, {'pg': pg, 'p2': p2}, {'con_load': con_load, 'con_max': con_max}
 
-    # initialize iteration counter
-    iteration = 0
+def init_worker(l2:float):
+    """
+    This function creates the sub problem of the current process. The sub
+    problem is kept for all iterations and real time prices and for every
+    sample only the right hand side of the load constraint is updated.
+    """
+    global sub, sub_vars, sub_cons
+    sub, sub_vars, sub_cons = create_sub_problem(l2)
+    if parallel:
+        # one thread per worker to not oversubscribe the cores
+        sub.Params.Threads = 1
+    # the samples only change the right hand sides, hence gurobi keeps the
+    # basis of the previous sample and the dual simplex starts from it
+    sub.Params.Method = 1
+    sub.Params.LPWarmStart = 2
+
+def solve_samples(samples, results_master:dict, l2:float):
+    """
+    This function solves the sub problem of the current process for every
+    sample in samples and the real time price l2. It returns the results as
+    arrays with one row per sample and one column per hour.
+    """
+    # the real time price is the objective coefficient of p2, hence the sub
+    # problem is kept for the sensitivity analysis
+    sub_vars['p2'].Obj = l2
+
+    u = helper.get_hourly_values(results_master['u'], HOURS)
+    p1 = helper.get_hourly_values(results_master['p1'], HOURS)
+
+    # update the capacity constraint with the current solution of the master
+    # problem, the load constraint is updated for every sample below
+    sub_cons['con_max'].RHS = pmax*u
+    load_rhs = samples - p1
+
+    results = {
+        name: np.empty((len(samples), len(HOURS)))
+        for name in ['pg', 'p2', 'dual_con1', 'dual_con2']
+    }
+    for i, sample in enumerate(samples):
+        # the workers do not print to not compete for the output
+        if not parallel:
+            helper.print_status(i)
+        # update constraint with new load sample
+        sub_cons['con_load'].RHS = load_rhs[i]
+        # solve model
+        sub.optimize()
+        results['pg'][i] = sub_vars['pg'].X
+        results['p2'][i] = sub_vars['p2'].X
+        # the dual variables of the first stage variables are the derivatives
+        # of the right hand sides with respect to u and p1
+        results['dual_con1'][i] = pmax*sub_cons['con_max'].Pi
+        results['dual_con2'][i] = -sub_cons['con_load'].Pi
 
-    helper.print_caption('Initialization')
+    return results
 
-    print('Solving master problem...')
+def solve_samples_batch(samples, results_master:dict, l2:float):
+    """
+    This function solves the sub problem for every sample in samples at once
+    and returns the results like 'solve_samples'. For every hour, the demand
+    which is not covered by the forward contract is produced by the generator
+    up to its capacity if it is cheaper than the real time contract, the rest
+    is bought with the real time contract.
+    """
+    u = helper.get_hourly_values(results_master['u'], HOURS)
+    p1 = helper.get_hourly_values(results_master['p1'], HOURS)
+
+    demand = np.maximum(samples - p1, 0)
+    if c2 < l2:
+        pg = np.minimum(demand, pmax*u)
+    else:
+        pg = np.zeros_like(demand)
+    p2 = demand - pg
+
+    # the dual variable of the load constraint is the cost of the last unit of
+    # the demand and the dual variable of the capacity constraint is the saving
+    # of one more unit of the generator if the capacity is binding
+    dual_con_load = np.where(demand > 0, np.where(p2 > 0, l2, c2), 0)
+    dual_con_max = np.where((p2 > 0) & (c2 < l2), c2 - l2, 0)
+
+    return {
+        'pg': pg,
+        'p2': p2,
+        'dual_con1': pmax*dual_con_max,
+        'dual_con2': -dual_con_load
+    }
+
+def solve_sub_problem(executor, results_master:dict, samples, l2:float):
+    """
+    This function solves the sub problem for all samples in samples and returns
+    the results as arrays with one row per sample. If an executor is passed,
+    the samples are split into one chunk per worker and solved in parallel.
+    """
+    print('Solving sub problem for all samples...')
+    if batch_solve:
+        return solve_samples_batch(samples, results_master, l2)
+
+    if executor is None:
+        return solve_samples(samples, results_master, l2)
+
+    chunks = np.array_split(samples, min(n_workers, len(samples)))
+    results = list(
+        executor.map(
+            solve_samples,
+            chunks,
+            [results_master]*len(chunks),
+            [l2]*len(chunks)
+        )
+    )
+    return {
+        name: np.concatenate([result[name] for result in results])
+        for name in results[0]
+    }
 
-    helper.solve_model(opt, master)
+###############################################################################
+### Main
+###############################################################################
 
-    results_master = helper.get_results(master)
+if __name__ == '__main__':
+    # samples and their weights for every solve of the master problem, the
+    # samples and weights of the current solve are used by the callback
+    if clustering:
+        # the cuts of the representative samples underestimate the expected
+        # costs of all samples because the sub problem is convex in the load,
+        # hence they are kept for the solve with all samples
+        CLUSTER_SAMPLES, CLUSTER_WEIGHTS = helper.get_clustered_samples(
+            SAMPLES, clusters=clusters, seed=seed
+        )
+        SOLVES = [(CLUSTER_SAMPLES, CLUSTER_WEIGHTS), (SAMPLES, None)]
+    else:
+        SOLVES = [(SAMPLES, None)]
 
     #---------------------------------------------------------------------------
     #---------------------------------------------------------------------------
-    # Sub problem
+    # Master problem
     #---------------------------------------------------------------------------
     #---------------------------------------------------------------------------
 
-    sub = pyo.ConcreteModel()
+    # the master problem does not depend on the real time price, hence it is
+    # built once and only the optimality cuts are replaced for every price
+    master = pyo.ConcreteModel()
 
     # **************************************************************************
     # Sets
     # **************************************************************************
 
     # hour set
-    sub.H = pyo.RangeSet(0,23)
+    master.H = pyo.RangeSet(0, 23)
 
     # **************************************************************************
     # Variables
     # **************************************************************************
 
-    # First stage variables
-
-    # no need for declaration of variable types because that is determined by
-    # corresponding variables of master problem
-    sub.u = pyo.Var(sub.H)
-    sub.p1 = pyo.Var(sub.H)
-
-    # Second stage variables
+    # unit commitment for generator
+    master.u = pyo.Var(master.H, within=pyo.Binary)
 
-    # electricity produced by generator
-    sub.pg = pyo.Var(sub.H, within=pyo.NonNegativeReals)
+    # electricity purchased with the forward contract
+    master.p1 = pyo.Var(master.H, within=pyo.NonNegativeReals)
 
-    # electrictiy bought from retailer
-    sub.p2 = pyo.Var(sub.H, within=pyo.NonNegativeReals)
+    # value function for second stage problem
+    master.alpha = pyo.Var(master.H)
 
     # **************************************************************************
     # Objective function
     # **************************************************************************
 
-    sub.OBJ = pyo.Objective(
-        expr=sum(c2*sub.pg[h] +l2*sub.p2[h] for h in sub.H)
-    )
+    def master_obj(master):
+        return sum(
+            c1*master.u[h] + l1*master.p1[h] + master.alpha[h]
+            for h in master.H
+        )
+    master.OBJ = pyo.Objective(rule=master_obj)
 
     # **************************************************************************
     # Constraints
     # **************************************************************************
 
-    # load must be covered by production or purchasing electrictiy
-    # take first random vector from samples
-    pl = SAMPLES[0, :]
-    def con_load(sub, H):
-        return sub.pg[H] + sub.p1[H] + sub.p2[H] >= pl[H]
-    sub.con_load = pyo.Constraint(sub.H, rule=con_load)
-
-    # maximum capacity of generator
-    def con_max(sub, H):
-        return sub.pg[H] <= pmax*sub.u[H]
-    sub.con_max = pyo.Constraint(sub.H, rule=con_max)
-
-    # ensure variable u is equal to the solution of the master problem
-    def dual_con1(sub, H):
-        return sub.u[H] == results_master['u'][H]
-    sub.dual_con1 = pyo.Constraint(sub.H, rule=dual_con1)
-
-    # ensure variable p1 is equal to the solution of the master problem
-    def dual_con2(sub, H):
-        return sub.p1[H] == results_master['p1'][H]
-    sub.dual_con2 = pyo.Constraint(sub.H, rule=dual_con2)
+    # alpha down (-500) is an arbitrary selected bound
+    def alphacon1(master, H):
+        return master.alpha[H] >= -500
+    master.alphacon1 = pyo.Constraint(master.H, rule=alphacon1)
 
     #---------------------------------------------------------------------------
     # Initialization of sub problem
     #---------------------------------------------------------------------------
 
-    # enable calculation of dual variables in pyomo
-    sub.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
-
-    print('Solving sub problem for all samples...')
-
-    results_sub = {}
-    counter = 1
-    for i, sample in enumerate(SAMPLES):
-        counter = helper.print_status(counter, i)
-        # filter for first sample because that is set in the initialization of
-        # the model
-        if i != 0:
-            # get new load sample
-            pl = sample
-            # update constraint
-            sub.con_load.reconstruct()
-        # solve model
-        helper.solve_model(opt, sub)
-        results_sub[i] = helper.get_results(sub, dual=True)
-
-    # check if upper and lower bound are converging
-    converged, upper_bound, lower_bound = helper.convergence_check(
-        objective,
-        master_prob,
-        results_master,
-        results_sub,
-        samples=SAMPLES,
-        epsilon=epsilon
-    )
-
-    helper.print_convergence(converged)
-
-    bounds_difference.append(abs(upper_bound - lower_bound))
+    if batch_solve:
+        # the sub problem is solved without gurobi
+        executor = None
+    elif parallel:
+        # every worker holds its own sub problem, which is kept for all
+        # real time prices
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=init_worker,
+            initargs=(l2s[0],)
+        )
+    else:
+        executor = None
+        init_worker(l2s[0])
+
+    # dataframe for computation times
+    times_dic = {'l2': [], 'time': []}
+
+    # loop over all real time prices and solve the L-shape method
+    for l2 in l2s:
+
+        helper.print_sens_step(f'Solve L-Shape method for {l2} $/kWh')
+
+        #-----------------------------------------------------------------------
+        # Helper variables
+        #-----------------------------------------------------------------------
+
+        # list for the differences of the bounds
+        bounds_difference = []
+
+        # list for the objective values
+        objective_values = []
+
+        # list for lower bound values
+        lower_bounds = []
+
+        # list for the solve of the master problem of every entry, 0 for the
+        # representative samples and 1 for all samples if clustering
+        solve_phases = []
+
+        # save current time to get the time of calculating
+        time_start = tm.time()
+
+        # the cuts of the previous real time price are removed
+        if hasattr(master, 'cuts'):
+            master.del_component(master.cuts)
+
+        # optimality cuts of the current real time price, which are added
+        # during the solving of the master problem
+        master.cuts = pyo.ConstraintList()
+
+        #-----------------------------------------------------------------------
+        # L-shape method
+        #-----------------------------------------------------------------------
+
+        # initialize iteration counter, an iteration is a new solution of the
+        # master problem
+        iteration = 0
+
+        def cut_callback(cb_m, cb_opt, cb_where):
+            """
+            This function is called by gurobi while solving the master problem.
+            For every new integer solution, the sub problem is solved for all
+            samples. If the bounds are not converged, the optimality cut of the
+            solution is added as lazy constraint and the master problem
+            continues with the current search tree.
+            """
+            global iteration, results_master, results_sub, converged
+            # the bounds of the last iteration are exported
+            global upper_bound, lower_bound
+            if cb_where != GRB.Callback.MIPSOL:
+                return
+
+            # the persistent solver only knows the variables of every index
+            cb_opt.cbGetSolution(
+                vars=list(master.u.values())
+                + list(master.p1.values())
+                + list(master.alpha.values())
+            )
+            solution = helper.get_results(master)
 
-    objective_values.append(upper_bound)
+            # gurobi passes the same solution several times until its cut
+            # binds, hence the sub problem is solved and the bounds are
+            # recorded only for a new solution or a new solve
+            if (
+                not solve_phases
+                or solve_phases[-1] != phase
+                or solution != results_master
+            ):
+                iteration += 1
 
-    lower_bounds.append(lower_bound)
+                helper.print_caption(f'Iteration {iteration}')
 
-    # optimize until upper and lower bound are converging
-    while not converged:
-        iteration += 1
+                results_master = solution
 
-        helper.print_caption(f'Iteration {iteration}')
+                results_sub = solve_sub_problem(
+                    executor, results_master, SCENARIOS, l2
+                )
 
-        def cut(master, H):
-            return (
-                sum(
-                    c2*results_sub[i]['pg'][H] + l2*results_sub[i]['p2'][H]
-                    + results_sub[i]['dual_con1'][H]*(
-                        master.u[H] - results_master['u'][H])
-                    + results_sub[i]['dual_con2'][H]*(
-                        master.p1[H] - results_master['p1'][H])
-                    for i, sample in enumerate(SAMPLES)
-                )/sample_size
-                <= master.alpha[H]
-            )
+                # check if upper and lower bound are converging
+                converged, upper_bound, lower_bound = helper.convergence_check(
+                    objective,
+                    master_prob,
+                    results_master,
+                    results_sub,
+                    samples=SCENARIOS,
+                    epsilon=epsilon,
+                    weights=WEIGHTS
+                )
 
-        setattr(master, f'cut_{iteration}', pyo.Constraint(master.H, rule=cut))
-        print(f'Added cut_{iteration}')
+                helper.print_convergence(converged)
 
-        print('Solving master problem...')
-        helper.solve_model(opt, master)
-        results_master = helper.get_results(master)
+                bounds_difference.append(abs(upper_bound - lower_bound))
 
-        # update dual constraint in sub problem
-        sub.dual_con1.reconstruct()
-        sub.dual_con2.reconstruct()
-
-        print('Solving sub problem for all samples...')
-        results_sub = {}
-        counter = 1
-        for i, sample in enumerate(SAMPLES):
-            # no if statement here because constraint con load is reconstructed
-            # with the first sample in samples
-            counter = helper.print_status(counter, i)
-            pl = sample
-            # update constraint
-            sub.con_load.reconstruct()
-            # solve model
-            helper.solve_model(opt, sub)
-            results_sub[i] = helper.get_results(sub, dual=True)
-
-        converged, upper_bound, lower_bound = helper.convergence_check(
-            objective,
-            master_prob,
-            results_master,
-            results_sub,
-            samples=SAMPLES,
-            epsilon=epsilon
-        )
+                objective_values.append(upper_bound)
 
-        helper.print_convergence(converged)
+                lower_bounds.append(lower_bound)
 
-        bounds_difference.append(abs(upper_bound - lower_bound))
+                solve_phases.append(phase)
 
-        objective_values.append(upper_bound)
+            if converged:
+                return
 
-        lower_bounds.append(lower_bound)
+            # the expected values of the sub problem are aggregated per hour
+            # before building the cut, hence the cut has one term per variable
+            # instead of one term per sample
+            cut_const = np.average(
+                c2*results_sub['pg'] + l2*results_sub['p2'],
+                axis=0,
+                weights=WEIGHTS
+            )
+            cut_u = np.average(
+                results_sub['dual_con1'], axis=0, weights=WEIGHTS
+            )
+            cut_p1 = np.average(
+                results_sub['dual_con2'], axis=0, weights=WEIGHTS
+            )
 
-    ############################################################################
-    ### Results
-    ############################################################################
+            for h in master.H:
+                cut = master.cuts.add(
+                    float(cut_const[h])
+                    + float(cut_u[h])*(master.u[h] - results_master['u'][h])
+                    + float(cut_p1[h])*(master.p1[h] - results_master['p1'][h])
+                    <= master.alpha[h]
+                )
+                cb_opt.cbLazy(cut)
+            print(f'Added cut of iteration {iteration}')
+
+        # the master problem is solved once for every entry of SOLVES, the
+        # cuts are passed as lazy constraints by the callback and the cuts of
+        # a previous solve are part of the model passed to gurobi
+        for phase, (SCENARIOS, WEIGHTS) in enumerate(SOLVES):
+            opt.set_instance(master)
+            opt.set_gurobi_param('LazyConstraints', 1)
+            opt.set_callback(cut_callback)
+
+            print(f'Solving master problem for {len(SCENARIOS)} samples...')
+            helper.solve_model(opt, master)
+
+        # the results of the last call of the callback do not have to belong to
+        # the optimal solution, hence the sub problem is solved again for all
+        # samples
+        results_master = helper.get_results(master)
+        results_sub = solve_sub_problem(
+            executor, results_master, SAMPLES, l2
+        )
 
-    helper.print_caption('End Results')
+        ########################################################################
+        ### Results
+        ########################################################################
 
-    with open(f'../3_results/results_sub_{l2}.json', 'w') as outfile:
-        json.dump(results_sub, outfile)
+        helper.print_caption('End Results')
 
-    with open(f'../3_results/results_master_{l2}.json', 'w') as outfile:
-        json.dump(results_master, outfile)
+        # the sub problem results are saved as arrays with one row per sample,
+        # the first stage variables are the same for all samples and saved
+        # with one value per hour
+        np.savez_compressed(
+            f'../3_results/results_sub_{l2}.npz',
+            u=helper.get_hourly_values(results_master['u'], HOURS),
+            p1=helper.get_hourly_values(results_master['p1'], HOURS),
+            **results_sub
+        )
 
-    time_end = tm.time()
-    times_dic['l2'].append(str(l2))
-    times_dic['time'].append(time_end - time_start)
-    print('Computation time:')
-    print(f'\t{round(time_end - time_start, 2)}s')
+        with open(f'../3_results/results_master_{l2}.json', 'w') as outfile:
+            json.dump(results_master, outfile)
+
+        time_end = tm.time()
+        times_dic['l2'].append(str(l2))
+        times_dic['time'].append(time_end - time_start)
+        print('Computation time:')
+        print(f'\t{round(time_end - time_start, 2)}s')
+
+        ########################################################################
+        ### Exports
+        ########################################################################
+
+        if sensitivity_analysis:
+            path = 'sensitivity analysis/'
+            prefix = f'_sensitivity_{l2}.csv'
+        else:
+            path = ''
+            prefix = '_no_sensitivity.csv'
+
+        if csv_output:
+            # export objective values, difference between bound into
+            # '3_results' as CSV
+            np.array(objective_values).tofile(
+                '../3_results/' + path + 'objective_values' + prefix,
+                sep = ','
+            )
+            np.array(upper_bound).tofile(
+                '../3_results/' + path + 'upper_bounds' + prefix,
+                sep = ','
+            )
+            np.array(lower_bound).tofile(
+                '../3_results/' + path + 'lower_bounds' + prefix,
+                sep = ','
+            )
+            np.array(bounds_difference).tofile(
+                '../3_results/' + path + 'bounds_differences' + prefix,
+                sep = ','
+            )
+            np.array(solve_phases).tofile(
+                '../3_results/' + path + 'solve_phases' + prefix,
+                sep = ','
+            )
 
-    ############################################################################
-    ### Exports
-    ############################################################################
+    if executor is not None:
+        executor.shutdown()
 
     if sensitivity_analysis:
-        path = 'sensitivity analysis/'
-        prefix = f'_sensitivity_{l2}.csv'
-    else:
-        path = ''
-        prefix = '_no_sensitivity.csv'
+        time_end_sens = tm.time()
+        times_dic['l2'].append('ALL')
+        times_dic['time'].append(time_end_sens - time_start_sens)
+        print('Computation time for sensitivity analysis:')
+        print(f'\t{round(time_end_sens - time_start_sens, 2)}s')
 
     if csv_output:
-        # export objective values, difference between bound into
-        # '3_results' as CSV
-        np.array(objective_values).tofile(
-            '../3_results/' + path + 'objective_values' + prefix,
-            sep = ','
-        )
-        np.array(upper_bound).tofile(
-            '../3_results/' + path + 'upper_bounds' + prefix,
-            sep = ','
-        )
-        np.array(lower_bound).tofile(
-            '../3_results/' + path + 'lower_bounds' + prefix,
-            sep = ','
-        )
-        np.array(bounds_difference).tofile(
-            '../3_results/' + path + 'bounds_differences' + prefix,
-            sep = ','
-        )
+        # save computation times as csv
+        df_time = pd.DataFrame(times_dic)
+        df_time.to_csv('../3_results/computation_times.csv', index=False)
+        # save samples as csv
+        df_samples = pd.DataFrame(SAMPLES)
+        df_samples.to_csv('../3_results/samples.csv', index=False)
 
-if sensitivity_analysis:
-    time_end_sens = tm.time()
-    times_dic['l2'].append('ALL')
-    times_dic['time'].append(time_end_sens - time_start_sens)
-    print('Computation time for sensitivity analysis:')
-    print(f'\t{round(time_end_sens - time_start_sens, 2)}s')
-
-if csv_output:
-    # save computation times as csv
-    df_time = pd.DataFrame(times_dic)
-    df_time.to_csv('../3_results/computation_times.csv', index=False)
-    # save samples as csv
-    df_samples = pd.DataFrame(SAMPLES)
-    df_samples.to_csv('../3_results/samples.csv', index=False)
-
-
-ending_time = tm.time()
-print(ending_time - starting_time)
\ No newline at end of file
+
+    ending_time = tm.time()
+    print(ending_time - starting_time)
\ No newline at end of file
@@ -1,20 +1,22 @@
 import pyomo.environ as pyo
 from pyomo.core import Var, value
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
 import numpy as np
 
 def get_monte_carlo_samples(values:list, samples=1000, seed=12):
     """
     This function creates a monte carlo sample of size samples. For every
     element in values, a sample is drawn from a normal distribution with the
-    elements value as mean and one third from the elements value as deviation.
+    elements value as mean and one third from the elements value as variance.
     """
-    # set seed
-    np.random.seed(seed)
-    # covariance matrix of pl
-    cov_pl = np.diagflat(np.array(values)*1/3)
+    values = np.asarray(values, dtype=np.float64)
+    # the covariance matrix of pl is diagonal, hence every element is drawn
+    # independently with the square root of its variance as deviation
+    std_pl = np.sqrt(values/3)
 
     # return random samples from normal distribution
-    return np.random.multivariate_normal(values, cov_pl, size=samples)
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((samples, len(values)))*std_pl + values
 
 def print_caption(name:str):
     print('###################################################################')
@@ -40,21 +42,26 @@ def print_convergence(converged:bool):
         print('--> Converged. Stop algorithm.')
         print()
 
-def print_status(counter:int, i:int):
+def print_status(i:int, step=1000):
     # increase by one because index of samples starts with zero
     i += 1
-    if counter < 100:
-        print('.', end='')
-        counter += 1
-        return counter
-    else:
-        print(i)
-        counter = 1
-        return counter
+    # only every step samples a status is printed
+    if i % step == 0:
+        print(f'{i} samples solved')
 
 
 def solve_model(solver, model):
-    solver.solve(model)
+    """
+    This function solves the model with the passed solver. A persistent solver
+    gets the model only once, afterwards changes of the model have to be passed
+    to the solver.
+    """
+    if isinstance(solver, PersistentSolver):
+        if solver._pyomo_model is not model:
+            solver.set_instance(model)
+        solver.solve()
+    else:
+        solver.solve(model)
 
 def get_results(model, dual=False, write=False):
     """
@@ -85,21 +92,77 @@ def get_results(model, dual=False, write=False):
                 dic[str(c)] = dic2
     return dic
 
+def get_hourly_values(values:dict, hours):
+    """
+    This function returns the values of a variable of 'get_results' as array
+    with one element for every hour in hours.
+    """
+    return np.array([values[h] for h in hours])
+
+def stack_results(results_sub:dict):
+    """
+    This function stacks the results of all samples, given as dictionary with
+    the results of 'get_results' for every sample, into one array for every
+    variable and dual variable. The arrays have one row per sample and one
+    column per hour.
+    """
+    samples = sorted(results_sub)
+    return {
+        name: np.array([
+            [results_sub[i][name][h] for h in sorted(results_sub[i][name])]
+            for i in samples
+        ])
+        for name in results_sub[samples[0]]
+    }
+
+def get_clustered_samples(samples, clusters=200, seed=12, iterations=100):
+    """
+    This function clusters the samples with the k-means algorithm. It returns
+    the centers of the clusters as representative samples and the share of
+    samples in every cluster as weights. Empty clusters are dropped.
+    """
+    rng = np.random.default_rng(seed)
+    centers = samples[rng.choice(len(samples), size=clusters, replace=False)]
+    squared_norms = (samples**2).sum(axis=1)
+    for iteration in range(iterations):
+        # squared distances between all samples and all centers
+        distances = (
+            squared_norms[:, None]
+            - 2*samples @ centers.T
+            + (centers**2).sum(axis=1)[None, :]
+        )
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=clusters)
+        # mean of the samples of every cluster, empty clusters keep the center
+        sums = (labels[:, None] == np.arange(clusters)).T @ samples
+        new_centers = np.where(
+            counts[:, None] > 0, sums/np.maximum(counts, 1)[:, None], centers
+        )
+        if np.allclose(new_centers, centers):
+            break
+        centers = new_centers
+    return centers[counts > 0], counts[counts > 0]/len(samples)
+
 def convergence_check(objective, master_prob, results_master, results_sub,
-                      samples, epsilon=0.001):
+                      samples, epsilon=0.001, weights=None):
     """
     This function checks if the lower bound and upper bound are converged. It
-    returns a boolean and the difference of the bounds.
+    returns a boolean and the difference of the bounds. The results of the sub
+    problem are passed as arrays with one row per sample, see 'stack_results'.
+    If weights is passed, the samples are weighted instead of equally likely.
     """
-    upper_bound = 0
-    for i, sample in enumerate(samples):
-        upper_bound += objective(
-            results_sub[i]['u'],
-            results_sub[i]['p1'],
-            results_sub[i]['pg'],
-            results_sub[i]['p2']
-        )
-    upper_bound = upper_bound/len(samples)
+    if weights is None:
+        weights = np.full(len(samples), 1/len(samples))
+    # the objective is linear, hence the expected objective value equals the
+    # objective value of the expected results, which are calculated with numpy
+    # for every hour over all samples, the first stage variables are the same
+    # for all samples
+    upper_bound = float(objective(
+        results_master['u'],
+        results_master['p1'],
+        weights @ results_sub['pg'],
+        weights @ results_sub['p2']
+    ))
     lower_bound = master_prob(
         results_master['u'],
         results_master['p1'],
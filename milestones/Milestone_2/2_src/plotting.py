@@ -4,6 +4,7 @@ import matplotlib.pyplot as plt
 import csv
 from matplotlib.lines import Line2D
 import json
+import os
 
 ###############################################################################
 ### Matplotlib Settings
@@ -239,24 +240,27 @@ plt.show
 i = '0.3'
 i_float = float(i)
 ffff = open(f'{path}results_master_'+i+'.json',)
-gggg = open(f'{path}results_sub_'+i+'.json')
 
 # returns JSON object as
 # a dictionary
 master_data_i = json.load(ffff)
-sub_data_i = json.load(gggg)
+# the sub problem results are saved as arrays with one row per sample,
+# former results are saved as json with one dictionary per sample
+if os.path.exists(f'{path}results_sub_'+i+'.npz'):
+    sub_data_i = np.load(f'{path}results_sub_'+i+'.npz')
+else:
+    with open(f'{path}results_sub_'+i+'.json') as file:
+        sub_json_i = json.load(file)
+    sub_data_i = {
+        key: np.array(
+            [list(sub_json_i[str(s)][key].values()) for s in range(1000)]
+        )
+        for key in ['pg', 'p2']
+    }
 
-p2_array = []
-pg_array = []
-for i in range(1000):
-    p2_array.append(list(sub_data_i[str(i)]['p2'].values()))
-    pg_array.append(list(sub_data_i[str(i)]['pg'].values()))
-
-pg_array = np.array(pg_array)
-pg_array = np.mean(pg_array,axis=0)
+pg_array = np.mean(sub_data_i['pg'][:1000],axis=0)
 
-p2_array = np.array(p2_array)
-p2_array = np.mean(p2_array,axis=0)
+p2_array = np.mean(sub_data_i['p2'][:1000],axis=0)
 
 
 fw_cost_i = sum(list(master_data_i['p1'].values()))*0.25
@@ -273,14 +277,32 @@ bounds_differences = np.loadtxt(
      delimiter=','
 )
 
+# solve of the master problem of every entry, 0 for the representative
+# samples and 1 for all samples, results without this file have one solve
+phases_file = f'{path}sensitivity analysis/solve_phases_sensitivity_0.3.csv'
+if os.path.exists(phases_file):
+    solve_phases = np.loadtxt(phases_file, delimiter=',', ndmin=1)
+else:
+    solve_phases = np.zeros(len(objective_values))
+
 # One Plot
-iterations = range(1, len(objective_values)+1)
+# every entry belongs to a new solution of the master problem found by gurobi
+solutions = range(1, len(objective_values)+1)
 plt.figure(figsize =(12,7))
-plt.plot(iterations, bounds_differences, label = "Bounds Difference",linewidth=4)
-plt.plot(iterations, objective_values, label = "Objective Value",linewidth=4)
+plt.plot(solutions, bounds_differences, label = "Bounds Difference",linewidth=4)
+plt.plot(solutions, objective_values, label = "Objective Value",linewidth=4)
+# the bounds are not monotone across the solves, hence the start of the solve
+# with all samples is marked
+if (solve_phases == 1).any():
+    plt.axvline(
+        np.argmax(solve_phases == 1) + 1,
+        color='grey',
+        linestyle='--',
+        label='Start of Solve with all Samples'
+    )
 plt.legend(fontsize = 14)
 plt.yscale("log")
-plt.xlabel("Iterations", fontsize=18)
+plt.xlabel("Master Problem Solutions", fontsize=18)
 plt.ylabel("\$", fontsize=18)
 plt.grid(axis='both')
 plt.title("Performance - Objective Value and Bound Difference", fontsize = 18)